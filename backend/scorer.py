@@ -1,128 +1,153 @@
-from typing import Dict, Set
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
 
-def calculate_ats_score(resume_data: Dict, job_description_keywords: Set[str] = None) -> Dict:
+# Weights configuration
+JD_WEIGHTS = {
+    "skill": 45,
+    "section": 15,
+    "contact": 5,
+    "quant": 15,
+    "format": 20,
+}
+GENERAL_WEIGHTS = {
+    "skill": 30,
+    "section": 20,
+    "contact": 10,
+    "quant": 20,
+    "format": 20,
+}
+
+SECTIONS_DOMAINS = {
+    "experience": ["experience", "work history", "employment"],
+    "education": ["education", "university", "college", "degree"],
+    "projects": ["projects", "portfolio"],
+    "summary": ["summary", "objective", "profile"]
+}
+
+
+def compile_job_keywords(job_description_keywords: Optional[Iterable[str]]) -> FrozenSet[str]:
     """
-    Calculates an ATS score (0-100) based on various factors.
-    Returns the score and a breakdown of feedback.
+    Normalizes a set of JD keywords once so it can be reused across many resumes.
     """
-    score = 0
-    feedback = []
-    
-    # Weights configuration
-    if job_description_keywords:
-        MAX_SKILL_SCORE = 45
-        MAX_SECTION_SCORE = 15
-        MAX_CONTACT_SCORE = 5
-        MAX_QUANT_SCORE = 15
-        MAX_FORMAT_SCORE = 20
-    else:
-        MAX_SKILL_SCORE = 30
-        MAX_SECTION_SCORE = 20
-        MAX_CONTACT_SCORE = 10
-        MAX_QUANT_SCORE = 20
-        MAX_FORMAT_SCORE = 20
+    if not job_description_keywords:
+        return frozenset()
+    return frozenset(k.lower() for k in job_description_keywords)
 
-    # 1. Skill Match
+
+def extract_resume_features(resume_data: Dict) -> Dict:
+    """
+    Computes the resume-side inputs to the ATS score (skills, sections, contact,
+    digit and word counts). These do not depend on the job description, so they
+    can be computed once and scored against any number of JDs.
+    """
     text_lower = resume_data.get("text", "").lower()
     skills = set(resume_data.get("skills", []))
-    if job_description_keywords:
-        # Convert all to lower for comparison
-        jd_keywords = set(k.lower() for k in job_description_keywords)
-        resume_skills_lower = set(s.lower() for s in skills)
-        
-        matches = resume_skills_lower.intersection(jd_keywords)
-        match_count = len(matches)
-        total_keywords = len(jd_keywords)
-        
-        if total_keywords > 0:
-            # Score is proportional to match rate
-            skill_score = min(MAX_SKILL_SCORE, (match_count / total_keywords) * MAX_SKILL_SCORE)
-            score += skill_score
-            feedback.append(f"JD Skill Match: {int(skill_score)}/{MAX_SKILL_SCORE} \
-                ({match_count}/{total_keywords} keywords matched)")
-            
-            missing = list(jd_keywords - resume_skills_lower)
-            if missing:
-                # Show top 5 missing skills
-                feedback.append(f"Missing Key Skills from JD: {', '.join(missing[:5])}")
-        else:
-             score += MAX_SKILL_SCORE # If JD has no keywords extracted, give full points purely for not failing
-    else:
-        # General scoring if no specific JD provided
-        skill_count = len(skills)
-        if skill_count >= 10:
-            score += MAX_SKILL_SCORE
-            feedback.append(f"Skill Match: {MAX_SKILL_SCORE}/{MAX_SKILL_SCORE} (Good number of skills detected)")
-        elif skill_count >= 5:
-            score += MAX_SKILL_SCORE / 2
-            feedback.append(f"Skill Match: {MAX_SKILL_SCORE / 2}/{MAX_SKILL_SCORE} (Could add more relevant skills)")
-        else:
-            score += 5
-            feedback.append(f"Skill Match: 5/{MAX_SKILL_SCORE} (Very few skills detected)")
-
 
-    # 2. Section Presence
     # Use parsed sections from Gemini if available, otherwise fallback to regex
     parsed_sections = resume_data.get("parsed_sections")
-    
-    sections_domains = {
-        "experience": ["experience", "work history", "employment"],
-        "education": ["education", "university", "college", "degree"],
-        "projects": ["projects", "portfolio"],
-        "summary": ["summary", "objective", "profile"]
-    }
-    
-    section_score = 0
     missing_sections = []
-    points_per_section = MAX_SECTION_SCORE / 4
-    
     if parsed_sections:
         # Use structured data check
-        for section in sections_domains.keys():
+        for section in SECTIONS_DOMAINS.keys():
             # Check if section content exists and is not empty or "None"
             content = parsed_sections.get(section)
-            if content and len(str(content).strip()) > 10: # Basic length check
-                section_score += points_per_section
-            else:
+            if not (content and len(str(content).strip()) > 10): # Basic length check
                 missing_sections.append(section)
     else:
         # Fallback to Text Search
-        text_lower = resume_data.get("text", "").lower()
-        for section, keywords in sections_domains.items():
-            if any(k in text_lower for k in keywords):
-                section_score += points_per_section
-            else:
+        for section, keywords in SECTIONS_DOMAINS.items():
+            if not any(k in text_lower for k in keywords):
                 missing_sections.append(section)
-    
+
+    return {
+        "skill_count": len(skills),
+        "skills_lower": frozenset(s.lower() for s in skills),
+        "sections_found": len(SECTIONS_DOMAINS) - len(missing_sections),
+        "missing_sections": missing_sections,
+        "has_email": bool(resume_data.get("email")),
+        "has_phone": bool(resume_data.get("phone")),
+        # check for digits (simple heuristic for metrics like "50%", "10 years", "$1M")
+        "digit_count": len(re.findall(r'\d+', text_lower)),
+        "word_count": len(text_lower.split()),
+    }
+
+
+def _skill_score(features: Dict, jd_keywords: FrozenSet[str], weights: Dict) -> tuple:
+    """
+    Scores the skill match component. Returns (score, feedback).
+    """
+    MAX_SKILL_SCORE = weights["skill"]
+    feedback = []
+
+    if jd_keywords:
+        resume_skills_lower = features["skills_lower"]
+        match_count = len(resume_skills_lower & jd_keywords)
+        total_keywords = len(jd_keywords)
+
+        # Score is proportional to match rate
+        skill_score = min(MAX_SKILL_SCORE, (match_count / total_keywords) * MAX_SKILL_SCORE)
+        feedback.append(f"JD Skill Match: {int(skill_score)}/{MAX_SKILL_SCORE} \
+                ({match_count}/{total_keywords} keywords matched)")
+
+        missing = list(jd_keywords - resume_skills_lower)
+        if missing:
+            # Show top 5 missing skills
+            feedback.append(f"Missing Key Skills from JD: {', '.join(missing[:5])}")
+        return skill_score, feedback
+
+    # General scoring if no specific JD provided
+    skill_count = features["skill_count"]
+    if skill_count >= 10:
+        feedback.append(f"Skill Match: {MAX_SKILL_SCORE}/{MAX_SKILL_SCORE} (Good number of skills detected)")
+        return MAX_SKILL_SCORE, feedback
+    elif skill_count >= 5:
+        feedback.append(f"Skill Match: {MAX_SKILL_SCORE / 2}/{MAX_SKILL_SCORE} (Could add more relevant skills)")
+        return MAX_SKILL_SCORE / 2, feedback
+    feedback.append(f"Skill Match: 5/{MAX_SKILL_SCORE} (Very few skills detected)")
+    return 5, feedback
+
+
+def _resume_side_score(features: Dict, weights: Dict) -> tuple:
+    """
+    Scores the JD-independent components (sections, contact, metrics, length).
+    Returns (score, feedback).
+    """
+    MAX_SECTION_SCORE = weights["section"]
+    MAX_CONTACT_SCORE = weights["contact"]
+    MAX_QUANT_SCORE = weights["quant"]
+    MAX_FORMAT_SCORE = weights["format"]
+    score = 0
+    feedback = []
+
+    # 2. Section Presence
+    points_per_section = MAX_SECTION_SCORE / 4
     # Rounding for cleanliness
-    section_score = int(section_score) 
+    section_score = int(features["sections_found"] * points_per_section)
     score += section_score
     feedback.append(f"Section Structure: {section_score}/{MAX_SECTION_SCORE}")
-    if missing_sections:
-        feedback.append(f"Missing sections likely: {', '.join(missing_sections)}")
+    if features["missing_sections"]:
+        feedback.append(f"Missing sections likely: {', '.join(features['missing_sections'])}")
 
     # 3. Contact Info
     contact_score = 0
     points_per_contact = MAX_CONTACT_SCORE / 2
-    
-    if resume_data.get("email"):
+
+    if features["has_email"]:
         contact_score += points_per_contact
     else:
         feedback.append("Missing Email Address")
-        
-    if resume_data.get("phone"):
+
+    if features["has_phone"]:
         contact_score += points_per_contact
     else:
         feedback.append("Missing Phone Number")
-    
+
     contact_score = int(contact_score)
     score += contact_score
     feedback.append(f"Contact Info: {contact_score}/{MAX_CONTACT_SCORE}")
 
     # 4. Content Quality / Quantifiable Results
-    # check for digits (simple heuristic for metrics like "50%", "10 years", "$1M")
-    import re
-    digit_count = len(re.findall(r'\d+', text_lower))
+    digit_count = features["digit_count"]
     if digit_count > 10:
         score += MAX_QUANT_SCORE
         feedback.append(f"Quantifiable Results: {MAX_QUANT_SCORE}/{MAX_QUANT_SCORE} (Good use of numbers/metrics)")
@@ -131,12 +156,11 @@ def calculate_ats_score(resume_data: Dict, job_description_keywords: Set[str] =
         score += sub_score
         feedback.append(f"Quantifiable Results: {sub_score}/{MAX_QUANT_SCORE} (Try to quantify more achievements)")
     else:
-        score += 0
         feedback.append(f"Quantifiable Results: 0/{MAX_QUANT_SCORE} (Lack of measurable results)")
-        
+
     # 5. Length / Formatting
     # Simple check on text length
-    word_count = len(text_lower.split())
+    word_count = features["word_count"]
     if 200 <= word_count <= 2000:
         score += MAX_FORMAT_SCORE
         feedback.append(f"Length/Formatting: {MAX_FORMAT_SCORE}/{MAX_FORMAT_SCORE} (Good length)")
@@ -149,8 +173,81 @@ def calculate_ats_score(resume_data: Dict, job_description_keywords: Set[str] =
         score += sub_score
         feedback.append(f"Length/Formatting: {sub_score}/{MAX_FORMAT_SCORE} (Likely too long)")
 
+    return score, feedback
+
+
+def _score_features(features: Dict, jd_keywords: FrozenSet[str], resume_side: Dict) -> Dict:
+    """
+    Combines the skill component for one JD with the cached resume-side result.
+    `resume_side` maps the weights profile name ("jd" / "general") to its (score, feedback).
+    """
+    profile = "jd" if jd_keywords else "general"
+    weights = JD_WEIGHTS if jd_keywords else GENERAL_WEIGHTS
+    if profile not in resume_side:
+        resume_side[profile] = _resume_side_score(features, weights)
+    base_score, base_feedback = resume_side[profile]
+
+    skill_score, skill_feedback = _skill_score(features, jd_keywords, weights)
+    return {
+        "total_score": int(skill_score + base_score),
+        "breakdown": skill_feedback + base_feedback
+    }
+
+
+def calculate_ats_score(resume_data: Dict, job_description_keywords: Set[str] = None) -> Dict:
+    """
+    Calculates an ATS score (0-100) based on various factors.
+    Returns the score and a breakdown of feedback.
+    """
+    features = extract_resume_features(resume_data)
+    return _score_features(features, compile_job_keywords(job_description_keywords), {})
+
+
+def score_against_jobs(resume_data: Dict, jobs: Dict[str, Iterable[str]]) -> Dict:
+    """
+    Scores one resume against many open roles at once.
+    `jobs` maps a role name to its JD keywords (raw or from `compile_job_keywords`).
+    Resume-side features are computed once; only the skill match is redone per role.
+    Returns per-role results and a best-fit ranking of (role, score), highest first.
+    """
+    features = extract_resume_features(resume_data)
+    resume_side = {}
+    results = {
+        role: _score_features(features, compile_job_keywords(keywords), resume_side)
+        for role, keywords in jobs.items()
+    }
+    ranking = sorted(
+        ((role, result["total_score"]) for role, result in results.items()),
+        key=lambda item: item[1],
+        reverse=True
+    )
     return {
-        "total_score": int(score),
-        "breakdown": feedback
+        "results": results,
+        "ranking": ranking
     }
 
+
+def score_matrix(resumes: List[Dict], jobs: Dict[str, Iterable[str]]) -> Dict:
+    """
+    Scores every resume against every role.
+    JD keywords are compiled once and resume features are extracted once per resume.
+    Returns the role order, a resumes x roles score matrix and the best-fit role per resume.
+    """
+    roles = list(jobs.keys())
+    compiled = [compile_job_keywords(jobs[role]) for role in roles]
+
+    matrix = []
+    best_fit = []
+    for resume_data in resumes:
+        features = extract_resume_features(resume_data)
+        resume_side = {}
+        row = [_score_features(features, keywords, resume_side)["total_score"] for keywords in compiled]
+        matrix.append(row)
+        # Ties go to the role listed first
+        best_fit.append(roles[row.index(max(row))] if row else None)
+
+    return {
+        "roles": roles,
+        "matrix": matrix,
+        "best_fit": best_fit
+    }